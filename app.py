@@ -1,25 +1,64 @@
+import gc
+import hashlib
 import os
 import io
+import re
+import shutil
+import sqlite3
 import uuid
+from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 
 import requests
+from requests.adapters import HTTPAdapter
 from flask import (
     Flask, render_template, request, redirect,
     url_for, send_file, flash, jsonify, abort
 )
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
 # Optional: install these for DOCX/PDF support
-# pip install python-docx pdfplumber
+# pip install python-docx pymupdf pdfplumber
 try:
     from docx import Document
-    import pdfplumber
 except ImportError:
     Document = None
+
+try:
+    import pymupdf as fitz  # PyMuPDF >= 1.24.3
+except ImportError:
+    try:
+        import fitz  # older PyMuPDF
+    except ImportError:
+        fitz = None
+
+try:
+    import pdfplumber
+except ImportError:
     pdfplumber = None
 
+# Present when running under gunicorn's gevent workers (see gunicorn_conf.py)
+try:
+    import gevent
+    from gevent import monkey as gevent_monkey
+except ImportError:
+    gevent = None
+
+# Optional: faster JSON for the /api/* endpoints
+# pip install orjson
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # -------------------------------------------------------------------
 # CREDENTIALS / SECRETS (edit these later)
 # -------------------------------------------------------------------
@@ -31,6 +70,23 @@ DEEPL_API_KEY = "c0f59d26-3794-492d-91db-38d4b47d3749:fx"  # recommended
 
 DEEPL_API_PLAN = "free"                     # or "pro"
 
+# DeepL accepts up to 50 `text` fields per request (and 128 KiB per body)
+DEEPL_MAX_SEGMENTS = 50
+# Budget for the form-encoded `text` fields; leaves room for the lang fields
+DEEPL_MAX_BATCH_BYTES = 120 * 1024
+DEEPL_MAX_WORKERS = 4
+
+# Translation cache is pruned (oldest first) above ~1 GiB of cached text;
+# the check runs at startup and after every N newly cached paragraphs
+TRANSLATION_CACHE_MAX_CHARS = 2**30
+TRANSLATION_CACHE_PRUNE_EVERY = 1000
+
+# PDF text extraction: "pymupdf" (fast, default) or "pdfplumber" (fallback)
+PDF_BACKEND = os.environ.get("PDF_BACKEND", "pymupdf").lower()
+
+# Number of translation jobs processed in parallel in the background
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+
 # API token used by WordPress plugin (X-API-Key)
 API_TOKEN = "Ali1234"
 
@@ -46,10 +102,23 @@ os.makedirs(INSTANCE_DIR, exist_ok=True)
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Original/translated texts of each job live here, not in the DB
+JOBS_DIR = os.path.join(INSTANCE_DIR, "jobs")
+os.makedirs(JOBS_DIR, exist_ok=True)
+
+# How much text the job page shows inline (full text via download)
+PREVIEW_CHARS = 20000
+
 app = Flask(__name__)
 app.config["SECRET_KEY"] = "change-me"
 app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(INSTANCE_DIR, "app.sqlite")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+# Under gunicorn/gevent many requests share one process; size the pool for it
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "pool_pre_ping": True,
+    "pool_size": int(os.environ.get("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "40")),
+}
 
 # Simple admin password (now fully inside app.py)
 app.config["ADMIN_PASSWORD"] = ADMIN_PASSWORD
@@ -59,11 +128,61 @@ app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 
 db = SQLAlchemy(app)
 
+# Shared HTTP session so DeepL calls reuse keep-alive connections
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+# Translation jobs run here so requests return right away
+JOB_EXECUTOR = ThreadPoolExecutor(max_workers=JOB_WORKERS)
+
+
+def run_blocking(func, *args):
+    """
+    Run CPU-bound work (file parsing, large regex passes) on gevent's native
+    threadpool when monkey-patched; patched "threads" are greenlets and
+    would stall every connection of the worker meanwhile.
+    """
+    if gevent is not None and gevent_monkey.is_module_patched("threading"):
+        return gevent.get_hub().threadpool.apply(func, args)
+    return func(*args)
+
+
+class ORJSONProvider(JSONProvider):
+    """jsonify() backed by orjson; writes bytes straight into the response."""
+
+    option = orjson.OPT_SORT_KEYS if orjson is not None else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=self.option), mimetype="application/json"
+        )
+
+
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    """WAL + synchronous=NORMAL: cheaper commits, readers don't block the writer."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
 
 # Make config available in templates as `config`
 @app.context_processor
 def inject_config():
-    return dict(config=app.config)
+    return dict(config=app.config, running_statuses=RUNNING_STATUSES)
 
 
 # -------------------------------------------------------------------
@@ -84,12 +203,54 @@ class Job(db.Model):
     intent = db.Column(db.Text)             # prefilled from chatbot
     glossary_raw = db.Column(db.Text)       # raw glossary text from form
     original_filename = db.Column(db.String(255))
-    original_text = db.Column(db.Text)
-    translated_text = db.Column(db.Text)
+    # Legacy: texts of jobs created before they were moved to files
+    original_text = db.deferred(db.Column(db.Text))
+    translated_text = db.deferred(db.Column(db.Text))
+    worker_pid = db.Column(db.Integer)            # process running the job
+    original_path = db.Column(db.String(255))     # relative to INSTANCE_DIR
+    translated_path = db.Column(db.String(255))
     error_message = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("ix_job_created_at_desc", created_at.desc()),  # admin dashboard order
+        db.Index("ix_job_status", "status"),
+    )
+
+    @property
+    def job_dir(self):
+        return os.path.join(JOBS_DIR, self.job_uuid)
+
+    def write_text(self, kind, text):
+        """Store the "original" or "translated" text on disk."""
+        if text is None:
+            return
+        os.makedirs(self.job_dir, exist_ok=True)
+        path = os.path.join(self.job_dir, f"{kind}.txt")
+        # newline="": keep \r\n etc. exactly as they came in
+        with open(path, "w", encoding="utf-8", newline="") as fh:
+            fh.write(text)
+        setattr(self, f"{kind}_path", os.path.relpath(path, INSTANCE_DIR))
+
+    def read_text(self, kind, limit=None):
+        """Read the "original" or "translated" text (optionally only `limit` chars)."""
+        path = getattr(self, f"{kind}_path")
+        if path:
+            with open(os.path.join(INSTANCE_DIR, path), encoding="utf-8", newline="") as fh:
+                return fh.read(-1 if limit is None else limit)
+        text = getattr(self, f"{kind}_text")
+        if text is None or limit is None:
+            return text
+        return text[:limit]
+
+    def remove_unsaved_texts(self):
+        """Delete text files whose path never made it into the DB (e.g. after a rollback)."""
+        for kind in ("original", "translated"):
+            path = os.path.join(self.job_dir, f"{kind}.txt")
+            if not getattr(self, f"{kind}_path") and os.path.exists(path):
+                os.remove(path)
+
 
 class AuditLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -101,18 +262,89 @@ class AuditLog(db.Model):
     job = db.relationship("Job", backref=db.backref("audit_events", lazy=True))
 
 
+class TranslationCache(db.Model):
+    """Translated paragraphs, keyed by hash of (source, target, text)."""
+    key = db.Column(db.String(64), primary_key=True)
+    translated_text = db.Column(db.Text)
+    char_count = db.Column(db.Integer)  # len(translated_text), for pruning
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # covers SUM(char_count) and the oldest-first walk in prune_translation_cache()
+        db.Index("ix_translation_cache_created_chars", "created_at", "char_count"),
+    )
+
+
 # -------------------------------------------------------------------
 # Utilities
 # -------------------------------------------------------------------
 def init_db():
-    """Create tables if they don't exist."""
+    """Create tables and indexes if they don't exist."""
     db.create_all()
+    # create_all() skips existing tables, so add columns and indexes
+    # introduced later
+    inspector = db.inspect(db.engine)
+    with db.engine.begin() as conn:
+        for model in (Job, TranslationCache):
+            table = model.__table__
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(db.engine.dialect)
+                    conn.execute(db.text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                    ))
+    for model in (Job, TranslationCache):
+        for index in model.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+
+    # superseded by ix_translation_cache_created_chars
+    db.session.execute(db.text("DROP INDEX IF EXISTS ix_translation_cache_created_at"))
+    # rows cached before char_count existed (one-off, startup only)
+    db.session.execute(db.text(
+        "UPDATE translation_cache SET char_count = LENGTH(translated_text) WHERE char_count IS NULL"
+    ))
+    prune_translation_cache()
+    recover_interrupted_jobs()
+    db.session.commit()
+
+
+# Jobs in these states are still owned by a background worker
+RUNNING_STATUSES = ("Uploaded", "Translating")
+
+INTERRUPTED_MESSAGE = "Interrupted by a server restart – please submit the job again."
+
+
+def recover_interrupted_jobs(worker_pid=None):
+    """
+    Jobs only live in JOB_EXECUTOR's memory, so unfinished jobs of a process
+    that is gone (all of them at startup) will never finish: mark them as
+    Error and drop their parked uploads. The caller commits.
+    """
+    query = Job.query.filter(Job.status.in_(RUNNING_STATUSES))
+    if worker_pid is not None:
+        query = query.filter_by(worker_pid=worker_pid)
+    for job in query:
+        job.status = "Error"
+        job.error_message = INTERRUPTED_MESSAGE
+        log_event(job, "error", INTERRUPTED_MESSAGE)
+        remove_parked_uploads(job.job_uuid)
+    if worker_pid is None:
+        remove_parked_uploads()
+
+
+def remove_parked_uploads(job_uuid=None):
+    """Delete parked uploads of one job, or every parked upload."""
+    for name in os.listdir(app.config["UPLOAD_FOLDER"]):
+        prefix = name.split("_", 1)[0]
+        if (prefix == job_uuid) if job_uuid else JOB_UUID_RE.fullmatch(prefix):
+            os.remove(os.path.join(app.config["UPLOAD_FOLDER"], name))
 
 
 def log_event(job, event_type, description):
+    """Queue an audit event; it is written with the caller's next commit."""
     ev = AuditLog(job=job, event_type=event_type, description=description)
     db.session.add(ev)
-    db.session.commit()
 
 
 def count_words(text: str) -> int:
@@ -147,18 +379,195 @@ def parse_glossary(glossary_raw: str):
     return mapping
 
 
+@lru_cache(maxsize=256)
+def _compile_glossary(glossary_raw: str):
+    """
+    Build (pattern, mapping) for a glossary once and reuse it for every job
+    that sends the same glossary text.
+    Longest terms come first so "Vertragspartner" wins over "Vertrag".
+    """
+    mapping = {src: tgt for src, tgt in parse_glossary(glossary_raw).items() if src}
+    if not mapping:
+        return None, mapping
+    alternation = "|".join(re.escape(k) for k in sorted(mapping, key=len, reverse=True))
+    # (?<!\w)/(?!\w) instead of \b so terms starting/ending with punctuation still match
+    pattern = re.compile(r"(?<!\w)(" + alternation + r")(?!\w)")
+    return pattern, mapping
+
+
 def apply_glossary(text: str, glossary_raw: str) -> str:
-    mapping = parse_glossary(glossary_raw)
-    for src, tgt in mapping.items():
-        # naive replace; you can improve (word boundaries, case, etc.)
-        text = text.replace(src, tgt)
-    return text
+    pattern, mapping = _compile_glossary(glossary_raw or "")
+    if pattern is None or not text:
+        return text
+    return pattern.sub(lambda m: mapping[m.group(0)], text)
+
+
+# Paragraphs first; pieces still over the request budget are split on
+# single line breaks, then on sentence ends
+SEGMENT_SPLITS = (r"(\n\s*\n)", r"(\n)", r"((?<=[.!?])\s+)")
+
+
+def encoded_size(segment: str) -> int:
+    """Bytes `segment` takes in the x-www-form-urlencoded body ("&text=" + value)."""
+    return len(quote_plus(segment)) + 6
+
+
+def split_hard(text: str):
+    """
+    Last resort for a "sentence" larger than a request: cut before the last
+    space that fits (12 bytes per char is the encoded worst case), so words
+    stay whole. Returns the same alternating list as split_segments().
+    """
+    size = DEEPL_MAX_BATCH_BYTES // 12
+    result = []
+    while len(text) > size:
+        cut = max(text.rfind(" ", 0, size), text.rfind("\t", 0, size))
+        if cut <= 0:
+            # no whitespace at all: nothing better than a plain cut
+            result += [text[:size], ""]
+            text = text[size:]
+            continue
+        end = cut
+        while end < len(text) and text[end] in " \t":
+            end += 1
+        result += [text[:cut], text[cut:end]]
+        text = text[end:]
+    result.append(text)
+    return result
+
+
+def split_segments(text: str, level: int = 0):
+    """
+    Split text into paragraphs, keeping the separators so the translated
+    pieces can be joined back with the original spacing.
+    Returns a list alternating [paragraph, separator, paragraph, ...].
+    """
+    if level == len(SEGMENT_SPLITS):
+        return split_hard(text)
+
+    parts = re.split(SEGMENT_SPLITS[level], text)
+    result = []
+    for i, part in enumerate(parts):
+        if i % 2 == 0 and encoded_size(part) > DEEPL_MAX_BATCH_BYTES:
+            result.extend(split_segments(part, level + 1))
+        else:
+            result.append(part)
+    return result
+
+
+def batch_segments(segments):
+    """Group segments into batches that fit into one DeepL request."""
+    batches = []
+    current, current_bytes = [], 0
+    for seg in segments:
+        size = encoded_size(seg)
+        if current and (
+            len(current) >= DEEPL_MAX_SEGMENTS
+            or current_bytes + size > DEEPL_MAX_BATCH_BYTES
+        ):
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append(seg)
+        current_bytes += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def deepl_translate_batch(batch, source_lang: str, target_lang: str, base_url: str, api_key: str):
+    """Translate a list of segments with one request (multi-valued `text` field)."""
+    data = [("text", seg) for seg in batch] + [("target_lang", target_lang)]
+    if source_lang:
+        data.append(("source_lang", source_lang))
+
+    response = SESSION.post(
+        base_url,
+        data=data,
+        headers={"Authorization": f"DeepL-Auth-Key {api_key}"},
+        timeout=30,
+    )
+    response.raise_for_status()
+    payload = response.json()
+    translations = payload.get("translations", [])
+    return [t.get("text", "") for t in translations]
+
+
+def translation_cache_key(segment: str, source_lang: str, target_lang: str) -> str:
+    raw = f"{source_lang or ''}|{target_lang or ''}|{segment}".encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=32).hexdigest()
+
+
+def cached_translations(keys):
+    """Look up cached translations; returns {key: translated_text}."""
+    found = {}
+    keys = list(keys)
+    # stay well below SQLite's bound-parameter limit
+    for start in range(0, len(keys), 500):
+        rows = TranslationCache.query.filter(
+            TranslationCache.key.in_(keys[start:start + 500])
+        ).all()
+        found.update((row.key, row.translated_text) for row in rows)
+    return found
+
+
+_cache_rows_since_prune = 0
+
+
+def store_translations(entries):
+    """
+    Insert {key: translated_text} into the cache. Keys that another job
+    stored in the meantime are skipped instead of failing the insert.
+    """
+    global _cache_rows_since_prune
+    if not entries:
+        return
+    stmt = sqlite_insert(TranslationCache).on_conflict_do_nothing(index_elements=["key"])
+    db.session.execute(
+        stmt,
+        [
+            {"key": key, "translated_text": t, "char_count": len(t), "created_at": datetime.utcnow()}
+            for key, t in entries.items()
+        ],
+    )
+    _cache_rows_since_prune += len(entries)
+    if _cache_rows_since_prune >= TRANSLATION_CACHE_PRUNE_EVERY:
+        _cache_rows_since_prune = 0
+        prune_translation_cache()
+
+
+def prune_translation_cache(chunk=500):
+    """
+    Drop the oldest cache rows once cached text exceeds TRANSLATION_CACHE_MAX_CHARS.
+    Only the (created_at, char_count) index is read, never the cached text.
+    """
+    total = db.session.query(db.func.sum(TranslationCache.char_count)).scalar() or 0
+    excess = total - TRANSLATION_CACHE_MAX_CHARS
+    while excess > 0:
+        rows = (
+            db.session.query(TranslationCache.key, TranslationCache.char_count)
+            .order_by(TranslationCache.created_at)
+            .limit(chunk)
+            .all()
+        )
+        if not rows:
+            break
+        doomed = []
+        for key, char_count in rows:
+            if excess <= 0:
+                break
+            doomed.append(key)
+            excess -= char_count or 0
+        TranslationCache.query.filter(TranslationCache.key.in_(doomed)).delete(
+            synchronize_session=False
+        )
 
 
 def deepl_translate(text: str, source_lang: str, target_lang: str) -> str:
     """
     Call DeepL API.
     Credentials are now taken from constants / env at the top of app.py.
+    Long texts are split into paragraphs, sent in batches and the batches
+    are translated concurrently; the result keeps the original paragraph order.
     """
     api_key = DEEPL_API_KEY
     plan = DEEPL_API_PLAN
@@ -172,50 +581,187 @@ def deepl_translate(text: str, source_lang: str, target_lang: str) -> str:
     else:
         base_url = "https://api-free.deepl.com/v2/translate"
 
-    data = {
-        "text": text,
-        "target_lang": target_lang,
-    }
-    if source_lang:
-        data["source_lang"] = source_lang
+    parts = split_segments(text or "")
+    # Only paragraphs with content go to DeepL; separators stay untouched
+    todo = [i for i in range(0, len(parts), 2) if parts[i].strip()]
+    if not todo:
+        return ""
 
-    response = requests.post(
-        base_url,
-        data=data,
-        headers={"Authorization": f"DeepL-Auth-Key {api_key}"},
-        timeout=30,
+    # Repeated paragraphs (within this text or from earlier jobs) come from
+    # the cache; only unique misses are sent to DeepL
+    keys = {i: translation_cache_key(parts[i], source_lang, target_lang) for i in todo}
+    cache = cached_translations(set(keys.values()))
+    misses = {}
+    for i in todo:
+        if keys[i] not in cache:
+            misses.setdefault(keys[i], parts[i])
+
+    if misses:
+        batches = batch_segments(list(misses.values()))
+        if len(batches) == 1:
+            results = [deepl_translate_batch(batches[0], source_lang, target_lang, base_url, api_key)]
+        else:
+            workers = min(DEEPL_MAX_WORKERS, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(deepl_translate_batch, batch, source_lang, target_lang, base_url, api_key)
+                    for batch in batches
+                ]
+                results = [f.result() for f in futures]
+
+        translated = [t for batch_result in results for t in batch_result]
+        if len(translated) != len(misses):
+            raise RuntimeError("DeepL returned an unexpected number of translations")
+        for key, t in zip(misses, translated):
+            cache[key] = t
+        store_translations({key: cache[key] for key in misses})
+
+    for i in todo:
+        parts[i] = cache[keys[i]]
+    return "".join(parts)
+
+
+SCANNED_PDF_MESSAGE = "This looks like a scanned PDF (no extractable text); OCR is not enabled."
+
+
+def sample_page_numbers(page_count: int):
+    """First and middle page – enough to tell a scanned PDF apart."""
+    return sorted({0, page_count // 2}) if page_count else []
+
+
+def read_pdf_pymupdf(stream) -> str:
+    # Real files (parked uploads) are opened by path, no copy into Python bytes
+    path = getattr(stream, "name", None)
+    if isinstance(path, str) and os.path.isfile(path):
+        doc = fitz.open(path, filetype="pdf")
+    else:
+        doc = fitz.open(stream=stream.read(), filetype="pdf")
+    with doc:
+        samples = [doc.load_page(i) for i in sample_page_numbers(doc.page_count)]
+        if samples and all(
+            not page.get_text("text").strip() and page.get_images() for page in samples
+        ):
+            raise ValueError(SCANNED_PDF_MESSAGE)
+        return "\n".join(page.get_text("text") for page in doc)
+
+
+def read_pdf_pdfplumber(stream) -> str:
+    text = []
+    with pdfplumber.open(stream) as pdf:
+        samples = [pdf.pages[i] for i in sample_page_numbers(len(pdf.pages))]
+        if samples and all(
+            not (page.extract_text() or "").strip() and page.images for page in samples
+        ):
+            raise ValueError(SCANNED_PDF_MESSAGE)
+        for page in samples:
+            page.close()
+
+        for i, page in enumerate(pdf.pages, start=1):
+            text.append(page.extract_text() or "")
+            # pdfplumber keeps parsed layout objects per page; drop them
+            # right away so memory stays at roughly one page
+            page.close()
+            if i % 50 == 0:
+                gc.collect()
+    return "\n".join(text)
+
+
+def read_text_stream(stream) -> str:
+    """Decode a binary stream as UTF-8 without an intermediate bytes copy."""
+    # newline="" keeps line endings exactly as uploaded
+    wrapper = io.TextIOWrapper(stream, encoding="utf-8", errors="ignore", newline="")
+    try:
+        return wrapper.read()
+    finally:
+        # keep the underlying stream open for its owner
+        wrapper.detach()
+
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_NS = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+
+# Run content -> text, as python-docx's Run.text does it (w:br is handled apart)
+DOCX_RUN_TEXT = {W_NS + "tab": "\t", W_NS + "ptab": "\t", W_NS + "cr": "\n", W_NS + "noBreakHyphen": "-"}
+# Never descend into: nested paragraphs (text boxes), the duplicate
+# mc:Fallback rendering, and property blocks (w:tabs also holds w:tab)
+DOCX_SKIP = {W_NS + "p", MC_NS + "Fallback", W_NS + "pPr", W_NS + "rPr"}
+DOCX_CONTAINERS = {W_NS + "tbl", W_NS + "tr", W_NS + "tc", W_NS + "sdt", W_NS + "sdtContent"}
+
+
+def iter_docx_paragraphs(parent):
+    """Body-level paragraphs in document order, including table cells."""
+    for child in parent:
+        if child.tag == W_NS + "p":
+            yield child
+        elif child.tag in DOCX_CONTAINERS:
+            yield from iter_docx_paragraphs(child)
+
+
+def docx_paragraph_text(p) -> str:
+    """Text of one w:p; only text whose nearest w:p ancestor is `p` counts."""
+    parts = []
+    stack = list(reversed(p))
+    while stack:
+        el = stack.pop()
+        tag = el.tag
+        if tag == W_NS + "t":
+            parts.append(el.text or "")
+        elif tag in DOCX_RUN_TEXT:
+            parts.append(DOCX_RUN_TEXT[tag])
+        elif tag == W_NS + "br":
+            # page/column breaks produce no text, like python-docx
+            if el.get(W_NS + "type", "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag not in DOCX_SKIP:
+            stack.extend(reversed(el))
+    return "".join(parts)
+
+
+def read_docx(stream) -> str:
+    if Document is None:
+        return read_text_stream(stream)
+    doc = Document(stream)
+    # Walk the XML directly instead of building Paragraph/Run objects;
+    # this also picks up paragraphs inside tables
+    return "\n".join(
+        docx_paragraph_text(p) for p in iter_docx_paragraphs(doc.element.body)
     )
-    response.raise_for_status()
-    payload = response.json()
-    translations = payload.get("translations", [])
-    if not translations:
-        return ""
-    return translations[0].get("text", "")
+
+
+def read_pdf(stream) -> str:
+    if fitz is not None and (PDF_BACKEND == "pymupdf" or pdfplumber is None):
+        return read_pdf_pymupdf(stream)
+    if pdfplumber is not None:
+        return read_pdf_pdfplumber(stream)
+    return read_text_stream(stream)
+
+
+# Extension -> reader; anything else (or missing libs) is read as plain text
+FILE_READERS = {
+    ".txt": read_text_stream,
+    ".docx": read_docx,
+    ".pdf": read_pdf,
+}
 
 
 def read_file_content(file_storage):
     """Read TXT/DOCX/PDF into plain text."""
-    filename = secure_filename(file_storage.filename)
-    ext = filename.rsplit(".", 1)[-1].lower()
+    ext = os.path.splitext(file_storage.filename or "")[1].lower()
+    # Work on the (spooled / on-disk) stream directly instead of read()-ing
+    # the whole upload into a BytesIO first
+    stream = file_storage.stream
+    stream.seek(0)
+    return FILE_READERS.get(ext, read_text_stream)(stream)
 
-    if ext == "txt":
-        return file_storage.read().decode("utf-8", errors="ignore")
 
-    if ext == "docx" and Document is not None:
-        buf = io.BytesIO(file_storage.read())
-        doc = Document(buf)
-        return "\n".join(p.text for p in doc.paragraphs)
+JOB_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
 
-    if ext == "pdf" and pdfplumber is not None:
-        buf = io.BytesIO(file_storage.read())
-        text = []
-        with pdfplumber.open(buf) as pdf:
-            for page in pdf.pages:
-                text.append(page.extract_text() or "")
-        return "\n".join(text)
 
-    # Fallback if libs missing or unknown extension
-    return file_storage.read().decode("utf-8", errors="ignore")
+def get_job_or_404(job_uuid):
+    """Reject anything that is not one of our UUIDs before touching the DB."""
+    if not JOB_UUID_RE.fullmatch(job_uuid):
+        abort(404)
+    return Job.query.filter_by(job_uuid=job_uuid).first_or_404()
 
 
 def require_admin():
@@ -262,11 +808,11 @@ def upload_translate():
 
         uploaded_files = request.files.getlist("files")
 
-        jobs = []
+        pending = []
 
         # Case 1: text box mode
         if pasted_text.strip():
-            job = create_and_run_job(
+            pending.append(create_job(
                 client_email,
                 source_lang,
                 target_lang,
@@ -277,14 +823,13 @@ def upload_translate():
                 glossary_raw,
                 original_text=pasted_text,
                 original_filename=None,
-            )
-            jobs.append(job)
+            ))
 
         # Case 2: files
         for file in uploaded_files:
             if not file or file.filename == "":
                 continue
-            job = create_and_run_job(
+            pending.append(create_job(
                 client_email,
                 source_lang,
                 target_lang,
@@ -296,13 +841,14 @@ def upload_translate():
                 original_text=None,
                 original_filename=file.filename,
                 file_storage=file,
-            )
-            jobs.append(job)
+            ))
 
-        if not jobs:
+        if not pending:
             flash("Please paste text or upload at least one file.", "error")
             return redirect(url_for("upload_translate"))
 
+        # All jobs are committed together, then translated in parallel
+        jobs = start_jobs(pending)
         if len(jobs) == 1:
             return redirect(url_for("job_detail", job_uuid=jobs[0].job_uuid))
         else:
@@ -314,7 +860,7 @@ def upload_translate():
     return render_template("upload.html", intent=intent)
 
 
-def create_and_run_job(
+def create_job(
     client_email,
     source_lang,
     target_lang,
@@ -327,6 +873,10 @@ def create_and_run_job(
     original_filename=None,
     file_storage=None,
 ):
+    """
+    Add a new Job to the session (not committed yet) and park its upload.
+    Returns (job, original_text, upload_path) for start_jobs().
+    """
     job = Job(
         job_uuid=str(uuid.uuid4()),
         client_email=client_email,
@@ -339,56 +889,123 @@ def create_and_run_job(
         status="Uploaded",
         glossary_raw=glossary_raw,
         original_filename=original_filename,
+        worker_pid=os.getpid(),
     )
     db.session.add(job)
-    db.session.commit()
     log_event(job, "upload", "Job created")
 
-    # Read file content if needed
+    # The upload stream is gone once the request ends, so park the file
+    upload_path = None
     if original_text is None and file_storage is not None:
-        original_text = read_file_content(file_storage)
+        upload_path = save_upload(file_storage, job.job_uuid)
 
-    job.original_text = original_text
-    job.status = "Translating"
+    return job, original_text, upload_path
+
+
+def start_jobs(pending):
+    """Commit new jobs in one transaction and queue them on JOB_EXECUTOR."""
     db.session.commit()
-    log_event(job, "status_change", "Status -> Translating")
+    for job, original_text, upload_path in pending:
+        JOB_EXECUTOR.submit(run_translation_job, job.id, original_text, upload_path)
+    return [job for job, _, _ in pending]
 
-    try:
-        translated = deepl_translate(original_text, source_lang, target_lang)
-        translated = apply_glossary(translated, glossary_raw)
-        job.translated_text = translated
 
-        words = count_words(original_text)
-        job.word_count = words
-        job.price_estimate = compute_price(words, domain)
+def create_and_run_job(*args, **kwargs):
+    return start_jobs([create_job(*args, **kwargs)])[0]
 
-        job.status = "Done"  # you could add a "Review" step later
-        db.session.commit()
-        log_event(job, "status_change", "Status -> Done")
 
-        # TODO: send email notification here if email is configured
-        # send_completion_email(job)
+def save_upload(file_storage, job_uuid) -> str:
+    # job_uuid prefix lets recover_interrupted_jobs() find it again
+    filename = f"{job_uuid}_{secure_filename(file_storage.filename)}"
+    path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
+    file_storage.save(path)
+    return path
 
-    except Exception as e:
-        job.status = "Error"
-        job.error_message = str(e)
-        db.session.commit()
-        log_event(job, "error", str(e))
 
-    return job
+def run_translation_job(job_id, original_text=None, upload_path=None):
+    """Background part of a job: read file, translate, apply glossary."""
+    with app.app_context():
+        job = db.session.get(Job, job_id)
+        if job is None:
+            return
+        job_dir = job.job_dir
+
+        try:
+            # Read file content if needed (may fail early, e.g. scanned PDFs)
+            if original_text is None and upload_path is not None:
+                with open(upload_path, "rb") as fh:
+                    original_text = run_blocking(
+                        read_file_content,
+                        FileStorage(stream=fh, filename=job.original_filename),
+                    )
+
+            job.write_text("original", original_text)
+            # the only intermediate commit, so pollers can see progress
+            job.status = "Translating"
+            log_event(job, "status_change", "Status -> Translating")
+            db.session.commit()
+
+            translated = deepl_translate(original_text, job.source_lang, job.target_lang)
+            translated = run_blocking(apply_glossary, translated, job.glossary_raw)
+            job.write_text("translated", translated)
+
+            words = count_words(original_text)
+            job.word_count = words
+            job.price_estimate = compute_price(words, job.domain)
+
+            job.status = "Done"  # you could add a "Review" step later
+            log_event(job, "status_change", "Status -> Done")
+            db.session.commit()
+
+            # TODO: send email notification here if email is configured
+            # send_completion_email(job)
+
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(Job, job_id)
+            if job is None:
+                # deleted while running: drop whatever we wrote meanwhile
+                shutil.rmtree(job_dir, ignore_errors=True)
+                return
+            job.remove_unsaved_texts()
+            job.status = "Error"
+            job.error_message = str(e)
+            log_event(job, "error", str(e))
+            db.session.commit()
+
+        finally:
+            if upload_path and os.path.exists(upload_path):
+                os.remove(upload_path)
 
 
 @app.route("/job/<job_uuid>")
 def job_detail(job_uuid):
-    job = Job.query.filter_by(job_uuid=job_uuid).first_or_404()
-    return render_template("job_detail.html", job=job)
+    job = get_job_or_404(job_uuid)
+    return render_template(
+        "job_detail.html",
+        job=job,
+        original_preview=job.read_text("original", limit=PREVIEW_CHARS + 1),
+        translated_preview=job.read_text("translated", limit=PREVIEW_CHARS + 1),
+        preview_chars=PREVIEW_CHARS,
+    )
 
 
 @app.route("/download/<job_uuid>")
 def download_job(job_uuid):
-    job = Job.query.filter_by(job_uuid=job_uuid).first_or_404()
+    job = get_job_or_404(job_uuid)
     # For now: export TXT
     filename = (job.original_filename or "translation") + ".txt"
+    if job.translated_path:
+        # Stream the stored file (sendfile where available, supports Range/304)
+        return send_file(
+            os.path.join(INSTANCE_DIR, job.translated_path),
+            as_attachment=True,
+            download_name=filename,
+            mimetype="text/plain; charset=utf-8",
+            conditional=True,
+        )
+
+    # Legacy jobs keep their text in the DB
     buf = io.BytesIO()
     buf.write((job.translated_text or "").encode("utf-8"))
     buf.seek(0)
@@ -407,18 +1024,28 @@ def download_job(job_uuid):
 def admin_dashboard():
     if not require_admin():
         return "Forbidden", 403
-    jobs = Job.query.order_by(Job.created_at.desc()).all()
-    return render_template("admin.html", jobs=jobs)
+    page = request.args.get("page", 1, type=int)
+    per_page = min(request.args.get("per_page", 50, type=int), 200)
+    pagination = Job.query.order_by(Job.created_at.desc()).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
+    return render_template("admin.html", jobs=pagination.items, pagination=pagination)
 
 
 @app.route("/admin/delete/<job_uuid>", methods=["POST"])
 def admin_delete(job_uuid):
     if not require_admin():
         return "Forbidden", 403
-    job = Job.query.filter_by(job_uuid=job_uuid).first_or_404()
+    job = get_job_or_404(job_uuid)
+    if job.status in RUNNING_STATUSES:
+        # the background worker still writes to this row and its files
+        flash("Job is still running – delete it once it is Done or Error.", "error")
+        return redirect(url_for("admin_dashboard") + f"?password={app.config['ADMIN_PASSWORD']}")
     log_event(job, "delete", "Job deleted by admin")
+    db.session.flush()  # so the delete below detaches this event like the others
     db.session.delete(job)
     db.session.commit()
+    shutil.rmtree(job.job_dir, ignore_errors=True)
     return redirect(url_for("admin_dashboard") + f"?password={app.config['ADMIN_PASSWORD']}")
 
 
@@ -436,6 +1063,7 @@ def api_translate():
     source = data.get("source_lang") or ""
     target = data.get("target_lang") or "EN"
     translated = deepl_translate(text, source, target)
+    db.session.commit()  # persist new translation cache entries
     return jsonify({"translated_text": translated})
 
 
@@ -488,6 +1116,7 @@ def api_create_job():
         file_storage=None,
     )
 
+    # 202: translation runs in the background, poll /api/jobs/<job_uuid>
     return jsonify(
         {
             "job_uuid": job.job_uuid,
@@ -496,7 +1125,7 @@ def api_create_job():
             "price_estimate": job.price_estimate,
             "created_at": job.created_at.isoformat(),
         }
-    )
+    ), 202
 
 
 # 3) Get job metadata + texts
@@ -521,7 +1150,7 @@ def api_get_job(job_uuid):
     """
     require_api_token()
 
-    job = Job.query.filter_by(job_uuid=job_uuid).first_or_404()
+    job = get_job_or_404(job_uuid)
 
     return jsonify(
         {
@@ -536,8 +1165,8 @@ def api_get_job(job_uuid):
             "word_count": job.word_count,
             "price_estimate": job.price_estimate,
             "original_filename": job.original_filename,
-            "original_text": job.original_text,
-            "translated_text": job.translated_text,
+            "original_text": job.read_text("original"),
+            "translated_text": job.read_text("translated"),
             "error_message": job.error_message,
             "created_at": job.created_at.isoformat(),
             "updated_at": job.updated_at.isoformat() if job.updated_at else None,
@@ -550,12 +1179,12 @@ def api_get_job(job_uuid):
 def api_get_job_result(job_uuid):
     require_api_token()
 
-    job = Job.query.filter_by(job_uuid=job_uuid).first_or_404()
+    job = get_job_or_404(job_uuid)
     return jsonify(
         {
             "job_uuid": job.job_uuid,
             "status": job.status,
-            "translated_text": job.translated_text,
+            "translated_text": job.read_text("translated"),
             "error_message": job.error_message,
         }
     )
@@ -566,7 +1195,7 @@ def api_get_job_result(job_uuid):
 def api_status(job_uuid):
     require_api_token()
 
-    job = Job.query.filter_by(job_uuid=job_uuid).first_or_404()
+    job = get_job_or_404(job_uuid)
     return jsonify(
         {
             "job_uuid": job.job_uuid,
@@ -582,11 +1211,11 @@ def api_status(job_uuid):
 def api_download(job_uuid):
     require_api_token()
 
-    job = Job.query.filter_by(job_uuid=job_uuid).first_or_404()
+    job = get_job_or_404(job_uuid)
     return jsonify(
         {
             "job_uuid": job.job_uuid,
-            "translated_text": job.translated_text,
+            "translated_text": job.read_text("translated"),
         }
     )
 
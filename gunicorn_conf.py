@@ -0,0 +1,43 @@
+"""
+Gunicorn config for production:
+    gunicorn -c gunicorn_conf.py app:app
+"""
+# Patch before the app (and `requests`) is imported, so workers can serve
+# other requests while DeepL calls are on the wire.
+# This also turns JOB_EXECUTOR's threads into greenlets: CPU-bound steps
+# (PDF/DOCX extraction, glossary) are pushed to gevent's native threadpool
+# via app.run_blocking(); the short SQLite calls still run on the hub.
+from gevent import monkey
+
+monkey.patch_all()
+
+import multiprocessing  # noqa: E402
+import os  # noqa: E402
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2))
+worker_class = "gevent"
+worker_connections = 1000
+timeout = 120
+
+# Import the app once in the master, workers share it copy-on-write
+preload_app = True
+
+
+def when_ready(server):
+    from app import app, db, init_db
+
+    with app.app_context():
+        init_db()
+        # don't hand the master's DB connections to forked workers
+        db.engine.dispose()
+
+
+def child_exit(server, worker):
+    # Background jobs die with their worker; don't leave them "Translating"
+    from app import app, db, recover_interrupted_jobs
+
+    with app.app_context():
+        recover_interrupted_jobs(worker.pid)
+        db.session.commit()
+        db.engine.dispose()